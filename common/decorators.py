@@ -6,16 +6,22 @@ from loguru import logger
 def performance_counter(units='seconds'):
     """Counts performance of the function"""
     def decorator_performance_counter(func):
+        # Hoist per-call constants to decoration time
+        _process_name = f"{func.__module__}.{func.__name__}"
+        _info_level_no = logger.level("INFO").no
+
         @functools.wraps(func)
         def wrapper_performance_counter(*args, **kwargs):
             start_time = time.perf_counter()
             response = func(*args, **kwargs)
-            duration = round(time.perf_counter() - start_time, 2)
+            duration = time.perf_counter() - start_time
             if units == 'minutes':
-                duration = round(duration / 60, 2)  # counting by minutes
-            _process_name = f"{func.__module__}.{func.__name__}"
-            logger.bind(duration=duration, measured_function=_process_name).info(
-                f"Process '{_process_name}' finished with duration: {duration} {units}")
+                duration = duration / 60  # counting by minutes
+            # Skip the bind/format machinery entirely when INFO records are not consumed
+            if logger._core.min_level <= _info_level_no:
+                duration = round(duration, 2)
+                logger.bind(duration=duration, measured_function=_process_name).info(
+                    f"Process '{_process_name}' finished with duration: {duration} {units}")
             return response
         return wrapper_performance_counter
     return decorator_performance_counter
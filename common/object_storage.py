@@ -1,12 +1,15 @@
 import datetime
-import pandas as pd
+import json
 import sys
+import threading
+import time
 import config
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict
 from io import BytesIO
 from loguru import logger
 from common.config_parser import parse_app_properties
-from integrations.s3_storage import S3Minio
+from integrations.s3_storage import get_s3
 from integrations.elastic import Elastic
 
 
@@ -16,18 +19,11 @@ parse_app_properties(caller_globals=globals(), path=config.paths.object_storage.
 class ObjectStorage:
 
     def __init__(self):
-        self.s3_service = S3Minio()
+        self.s3_service = get_s3()
         self.elastic_service = Elastic()
-
-    @staticmethod
-    def flatten_dict(d):
-        result = {}
-        for k, v in d.items():
-            if isinstance(v, dict):
-                result.update(v)
-            else:
-                result[k] = v
-        return result
+        # Short-lived cache of metadata query results, process steps repeat near-identical queries
+        self._query_cache = {}
+        self._query_cache_lock = threading.Lock()
 
     def query(self,
               metadata_query: Dict,
@@ -37,7 +33,7 @@ class ObjectStorage:
               return_payload: bool = False,
               size: str = '10000',
               sort: Dict | None = None,
-              scroll: str = '1m',
+              keep_alive: str = '1m',
               ):
 
         # Create elastic query syntax
@@ -73,25 +69,109 @@ class ObjectStorage:
         if query_filter:
             query["bool"]["filter"] = query_filter
 
-        # Return query results
-        response = self.elastic_service.client.search(index=index, query=query, size=size, sort=sort, scroll=scroll)
-        scroll_id = response['_scroll_id']
-        hits = response["hits"]["hits"]
-        content_list = [self.flatten_dict(content) for content in hits]
-        while len(hits) > 0:
-            response = self.elastic_service.client.scroll(scroll_id=scroll_id, scroll=scroll)
-            hits = response["hits"]["hits"]
-            if hits:
-                content_list.extend([self.flatten_dict(content) for content in hits])
+        # Serve repeated metadata queries from the TTL cache; payload results hold file bytes and are not cached
+        cache_key = None
+        if not return_payload:
+            cache_key = (index, json.dumps(query, sort_keys=True, default=str), json.dumps(sort, sort_keys=True, default=str), size)
+            with self._query_cache_lock:
+                cached = self._query_cache.get(cache_key)
+                if cached and time.monotonic() - cached[0] < float(QUERY_CACHE_TTL):
+                    # Return copies so callers can attach content without polluting the cache
+                    return [item.copy() for item in cached[1]]
+
+        # Return query results paginated with point-in-time and search_after (cheaper on the cluster than scroll)
+        pit_id = self.elastic_service.client.open_point_in_time(index=index, keep_alive=keep_alive)['id']
+        if not sort:
+            sort = [{"_shard_doc": "asc"}]
+
+        # When payloads are requested, downloads are submitted per result page so S3 GETs overlap
+        # with the round trip of the next page instead of running as a second serial pass
+        executor = ThreadPoolExecutor(max_workers=int(DOWNLOAD_MAX_WORKERS)) if return_payload else None
+        futures = []
+        content_list = []
+        search_after = None
+        try:
+            while True:
+                response = self.elastic_service.client.search(query=query,
+                                                              size=size,
+                                                              sort=sort,
+                                                              pit={"id": pit_id, "keep_alive": keep_alive},
+                                                              search_after=search_after)
+                pit_id = response.get('pit_id', pit_id)
+                hits = response["hits"]["hits"]
+                # Flatten hits per page: merge document source with its id
+                page = [{'_id': hit['_id'], **hit['_source']} for hit in hits]
+                if executor:
+                    futures.extend(executor.submit(self.get_content, item) for item in page)
+                content_list.extend(page)
+                if len(hits) < int(size):
+                    break
+                search_after = hits[-1]['sort']
+        finally:
+            # Close point-in-time after retrieving data
+            self.elastic_service.client.close_point_in_time(id=pit_id)
+
+        if executor:
+            try:
+                # Gather in submission order to preserve hit order
+                content_list = [future.result() for future in futures]
+            finally:
+                executor.shutdown()
+
+        if cache_key:
+            with self._query_cache_lock:
+                if len(self._query_cache) >= 512:
+                    self._query_cache.clear()
+                self._query_cache[cache_key] = (time.monotonic(), [item.copy() for item in content_list])
+
+        return content_list
 
-        if return_payload:
-            for num, item in enumerate(content_list):
-                content_list[num] = self.get_content(item)
+    @staticmethod
+    def _latest_per_entity(files_metadata: List[Dict], sort_keys: List[str]) -> List[Dict]:
+        """
+        Keeps the newest metadata record per (entity, keyword) in a single pass.
 
-        # Delete scroll after retrieving data
-        self.elastic_service.client.clear_scroll(scroll_id=scroll_id)
+        Args:
+            files_metadata (list): A list of metadata dictionaries.
+            sort_keys (list): Field names compared lexicographically, highest combination wins.
 
-        return content_list
+        Returns:
+            list: One metadata dictionary per (entity, keyword)
+        """
+        latest = {}
+        for item in files_metadata:
+            key = (item.get("entity"), item.get("keyword"))
+            rank = tuple(str(item.get(sort_key) or "") for sort_key in sort_keys)
+            current = latest.get(key)
+            if current is None or rank > current[0]:
+                latest[key] = (rank, item)
+
+        return [item for _, item in latest.values()]
+
+    def download_contents(self, files_metadata: List[Dict], max_workers: int = int(DOWNLOAD_MAX_WORKERS)):
+        """
+        Downloads content for each metadata object concurrently as downloads are I/O-bound on S3 storage.
+
+        Args:
+            files_metadata (list): A list of metadata dictionaries.
+            max_workers (int): Maximum number of parallel downloads.
+
+        Returns:
+            list: Metadata dictionaries with 'content' field included (failed downloads are excluded)
+        """
+        metadata_with_content = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.get_content, file_object): file_object for file_object in files_metadata}
+            for future in as_completed(futures):
+                file_object = futures[future]
+                try:
+                    file_object['content'] = future.result()
+                    metadata_with_content.append(file_object)
+                except Exception as e:
+                    logger.error(f"Could not download file for: {file_object}")
+                    logger.error(sys.exc_info())
+
+        return metadata_with_content
 
     def get_content(self, metadata: dict, bucket_name: str | None = None):
         """
@@ -113,7 +193,7 @@ class ObjectStorage:
             logger.error(f"Metadata object does not have field: 'content_reference'")
             return
         logger.info(f"Downloading object: {content_reference}")
-        content = BytesIO(self.s3_service.download_object(bucket_name, content_reference))
+        content = self.s3_service.download_object_parallel(bucket_name, content_reference)
         content.name = content_reference
 
         return content
@@ -146,21 +226,12 @@ class ObjectStorage:
                                     index=index,
                                     )
 
-        # Convert to dataframe
-        df = pd.json_normalize(files_metadata)
-
         metadata_with_content = []
-        if not df.empty:
-            # Sort by latest version
-            df = df.sort_values(by=["Model.version", "Model.created"], ascending=[False, False]).groupby(["entity", "keyword"]).first()
-            # Get content
-            for file_object in df.reset_index().to_dict("records"):
-                try:
-                    file_object['content'] = self.get_content(metadata=file_object)
-                    metadata_with_content.append(file_object)
-                except Exception as e:
-                    logger.error(f"Could not download file for: {file_object}")
-                    logger.error(sys.exc_info())
+        if files_metadata:
+            # Keep the latest version per entity/keyword with a plain dict scan, no DataFrame needed
+            latest_files = self._latest_per_entity(files_metadata, sort_keys=["Model.version", "Model.created"])
+            # Get content in parallel
+            metadata_with_content = self.download_contents(files_metadata=latest_files)
         else:
             logger.warning(f"Requested files not available on Object Storage")
 
@@ -193,21 +264,12 @@ class ObjectStorage:
                                     index=index,
                                     )
 
-        # Convert to dataframe
-        df = pd.json_normalize(files_metadata)
-
         metadata_with_content = []
-        if not df.empty:
-            # Sort by latest version
-            df = df.sort_values(by=["startDate", "Model.version", "Model.created"], ascending=[False, False, False]).groupby(["entity", "keyword"]).first()
-            # Get content
-            for file_object in df.reset_index().to_dict("records"):
-                try:
-                    file_object['content'] = self.get_content(metadata=file_object)
-                    metadata_with_content.append(file_object)
-                except Exception as e:
-                    logger.error(f"Could not download file for: {file_object}")
-                    logger.error(sys.exc_info())
+        if files_metadata:
+            # Keep the latest version per entity/keyword with a plain dict scan, no DataFrame needed
+            latest_files = self._latest_per_entity(files_metadata, sort_keys=["startDate", "Model.version", "Model.created"])
+            # Get content in parallel
+            metadata_with_content = self.download_contents(files_metadata=latest_files)
         else:
             logger.warning(f"Requested files not available on Object Storage for filter: {range_filter}")
 
@@ -17,26 +17,37 @@ class Attribute:
     pass
 
 
-# List to store all configuration file paths
-paths = Paths()
-dirs_to_check = [config_directory]
+def _scan_config_files():
+    """Recursively collect configuration file paths as {directory name: {file stem: resolved path}}"""
+    found = {}
+    dirs_to_check = [config_directory]
+
+    # Recursively search for files in all folders
+    for path in dirs_to_check:
+        for child_path in path.iterdir():
 
-# Recursively search for files in all folders
-for path in dirs_to_check:
-    for child_path in path.iterdir():
+            # If path analyse further
+            if child_path.is_dir():
+                dirs_to_check.append(child_path)
 
-        # If path analyse further
-        if child_path.is_dir():
-            dirs_to_check.append(child_path)
+            if "__" in child_path.stem:
+                continue
 
-        if "__" in child_path.stem:
-            continue
+            # Add the full path of the configuration file
+            if child_path.is_file():
+                logger.debug(f"Found config file {child_path.resolve()}")
+                found.setdefault(child_path.parent.name, {})[child_path.stem] = child_path.resolve()
 
-        # Add the full path of the configuration file
-        if child_path.is_file():
-            logger.debug(f"Found config file {child_path.resolve()}")
+    return found
 
-            if not getattr(paths, child_path.parent.name, None):
-                setattr(paths, child_path.parent.name, Attribute())
 
-            setattr(getattr(paths, child_path.parent.name), child_path.stem, child_path.resolve())
+# Scan once per process at import; a freshness probe over the tree costs as much as the scan
+# itself, so an on-disk cache would only add staleness and pickle failure modes
+_found_paths = _scan_config_files()
+
+# Build attribute access structure from the collected paths
+paths = Paths()
+for _directory_name, _files in _found_paths.items():
+    setattr(paths, _directory_name, Attribute())
+    for _stem, _resolved_path in _files.items():
+        setattr(getattr(paths, _directory_name), _stem, _resolved_path)
@@ -1,13 +1,15 @@
 import logging
-import inspect
 import os
+import atexit
+import threading
+from collections import deque
 from loguru import logger
 import sys
 from pathlib import Path
 import datetime
 import traceback
 import time
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch, helpers
 import pypowsybl
 from common.config_parser import parse_app_properties
 
@@ -17,6 +19,10 @@ parse_app_properties(caller_globals=globals(),
                      eval_types=True)
 
 
+# Cached at module scope so the emit hot path does not resolve it per frame
+LOGGING_FILE = logging.__file__
+
+
 class InterceptHandler(logging.Handler):
     def emit(self, record: logging.LogRecord) -> None:
         try:
@@ -24,13 +30,13 @@ class InterceptHandler(logging.Handler):
         except ValueError:
             level = record.levelno
 
-        # Find caller from where originated the logged message
-        frame, depth = inspect.currentframe(), 0
+        # Find caller from where originated the logged message (sys._getframe is cheaper than inspect)
+        frame, depth = sys._getframe(1), 1
         while frame:
             filename = frame.f_code.co_filename
-            is_logging = filename == logging.__file__
+            is_logging = filename == LOGGING_FILE
             is_frozen = "importlib" in filename and "_bootstrap" in filename
-            if depth > 0 and not (is_logging or is_frozen):
+            if not (is_logging or is_frozen):
                 break
             frame = frame.f_back
             depth += 1
@@ -55,6 +61,33 @@ class ElasticLogHandler:
         self._last_retry = 0
         self._retry_interval = 30
 
+        # Buffer log records and ship them in bulk instead of one index call per record
+        self._buffer = deque()
+        self._buffer_size = 500
+        self._flush_interval = 2
+        self._buffer_lock = threading.Lock()
+        self._flush_timer = None
+        atexit.register(self.flush)
+
+    def flush(self):
+        """Send all buffered log records to Elasticsearch in a single bulk request"""
+        with self._buffer_lock:
+            if self._flush_timer:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._buffer:
+                return
+            actions = list(self._buffer)
+            self._buffer.clear()
+
+        try:
+            helpers.bulk(self.client, actions, raise_on_error=False)
+            self._connected = True
+        except Exception as e:
+            self._last_retry = time.time()
+            self._connected = False
+            print(f"Error while sending log messages to Elasticsearch, disable sink: {e}", file=sys.stderr)
+
     def write(self, message):
         now = time.time()
         if not self._connected and now - self._last_retry < self._retry_interval:
@@ -90,13 +123,17 @@ class ElasticLogHandler:
         if self.logs_rollover:
             index = f"{self.index}-{datetime.datetime.today():%Y%m}"
 
-        try:
-            self.client.index(index=index, document=log_entry)
-            self._connected = True
-        except Exception as e:
-            self._last_retry = now
-            self._connected = False
-            print(f"Error while sending log message to Elasticsearch, disable sink: {e}", file=sys.stderr)
+        with self._buffer_lock:
+            self._buffer.append({"_index": index, "_source": log_entry})
+            buffer_full = len(self._buffer) >= self._buffer_size
+            # Schedule a delayed flush so a quiet logger still ships its tail records
+            if not buffer_full and self._flush_timer is None:
+                self._flush_timer = threading.Timer(self._flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+        if buffer_full:
+            self.flush()
 
 
 def std_log_filter(record):
@@ -106,21 +143,24 @@ def std_log_filter(record):
     return True
 
 
-# Define log format
-# LOG_FORMAT = (
-#     "<green>{time:YYYY-MM-DD HH:mm:ss:SSS}</green> | "
-#     "<level>{level: <8}</level> | "
-#     "<cyan>{name: <50}</cyan> | "
-#     "<cyan>{function: <40}</cyan> | "
-#     "<cyan>{line: <4}</cyan> | "
-#     # "<cyan>{name}:{function}:{line:<50}</cyan> | "
-#     "<level>{message}</level>"
-# )
+# Define log format without markup tags so the colorizer is bypassed entirely on the hot path
+LOG_FORMAT = (
+    "{time:YYYY-MM-DD HH:mm:ss.SSS} | "
+    "{level: <8} | "
+    "{name}:{function}:{line} | "
+    "{message}\n{exception}"
+)
 
 # Configure STDERR (stream) sink according configuration
 logging.basicConfig(handlers=[InterceptHandler()], level=LOG_LEVEL, force=True)
 logger.remove()  # remove all existing handlers to have fresh setup
-logger.add(sink=sys.stderr, level=LOG_LEVEL, filter=std_log_filter)
+logger.add(sink=sys.stderr,
+           level=LOG_LEVEL,
+           format=LOG_FORMAT,
+           colorize=False,
+           backtrace=False,
+           diagnose=False,
+           filter=std_log_filter)
 logger.debug(f"Stream logger initialized with level: {LOG_LEVEL}")
 
 # Configure Elastic sink according configuration
@@ -1,15 +1,12 @@
-import triplets
 from pika import BasicProperties
 import uuid
 from datetime import datetime
-import pandas as pd
 from io import BytesIO
 import config
 from pathlib import Path
 from loguru import logger
-from integrations.s3_storage import S3Minio
+from integrations.s3_storage import get_s3
 from integrations.elastic import Elastic
-from common.rdf_converter import convert_cim_rdf_to_json, normalize_cim_payload
 from common.config_parser import parse_app_properties
 
 parse_app_properties(caller_globals=globals(),
@@ -23,11 +20,14 @@ parse_app_properties(caller_globals=globals(),
 class HandlerMetadataToObjectStorage:
 
     def __init__(self):
-        self.s3_service = S3Minio()
+        self.s3_service = get_s3()
         self.elastic_service = Elastic()
 
     def handle(self, message: bytes, properties: BasicProperties,  **kwargs):
 
+        # Deferred import keeps the triplestore stack off the module import path
+        import triplets
+
         # Store body content in BytesIO
         content = BytesIO(message)
         content.name = f"{properties.headers['messageID']}.xml"
@@ -79,10 +79,11 @@ class HandlerMetadataToObjectStorage:
 
 class HandlerInputDataToElastic:
 
+    # Immutable (root classes, index) pairs resolved once at class definition: one lookup per message
     KEYWORD_MAP = {
-        "CO": {"root_class": ["OrdinaryContingency", "ExceptionalContingency", "OutOfRangeContingency"], "index": ELASTIC_CONTINGENCIES_INDEX},
-        "AE": {"root_class": ["AssessedElement"], "index": ELASTIC_ASSESSED_ELEMENTS_INDEX},
-        "RA": {"root_class": ["GridStateAlterationRemedialAction"], "index": ELASTIC_REMEDIAL_ACTIONS_INDEX},
+        "CO": (("OrdinaryContingency", "ExceptionalContingency", "OutOfRangeContingency"), ELASTIC_CONTINGENCIES_INDEX),
+        "AE": (("AssessedElement",), ELASTIC_ASSESSED_ELEMENTS_INDEX),
+        "RA": (("GridStateAlterationRemedialAction",), ELASTIC_REMEDIAL_ACTIONS_INDEX),
     }
 
     def __init__(self):
@@ -90,25 +91,29 @@ class HandlerInputDataToElastic:
 
     def handle(self, message: bytes, properties: BasicProperties,  **kwargs):
 
+        # Deferred import keeps rdflib/pandas off the module import path
+        from common.rdf_converter import convert_cim_rdf_to_json, normalize_cim_payload
+
         # Get profile keyword
         keyword = properties.headers.get("keyword", None)
         if not keyword or keyword == 'UNDEFINED':
             logger.error(f"RMQ message does not have profile 'keyword' in headers")
             return message, properties
 
+        root_class, _index = self.KEYWORD_MAP[keyword]
+
         # Convert message from NC to JSON
         data = convert_cim_rdf_to_json(rdfxml=message,
-                                       root_class=self.KEYWORD_MAP[keyword]["root_class"],
+                                       root_class=root_class,
                                        key_mode=CONVERTER_KEY_MODE)
 
         # JSON normalize and transform to DataFrame
         df = normalize_cim_payload(payload=data, root_only=True)
 
-        # Convert to dictionary
-        data_to_send = df.astype(object).where(pd.notna(df), None).to_dict("records")
+        # Convert to dictionary; NaN scrubbing is left to the bulk serializer, orjson renders NaN as JSON null
+        data_to_send = df.to_dict("records")
 
         # Send to Elastic
-        _index = self.KEYWORD_MAP[keyword]["index"]
         logger.info(f"Sending data to index: {_index}")
         response = self.elastic_service.send_to_elastic_bulk(
             index=_index,
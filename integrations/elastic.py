@@ -1,18 +1,43 @@
 import datetime
 import os
 import requests
-import ndjson
+import orjson
 import pandas as pd
 import json
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict
-from elasticsearch import Elasticsearch
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import config
 from common.config_parser import parse_app_properties
 from loguru import logger
 
 parse_app_properties(caller_globals=globals(), path=config.paths.integrations.elastic)
 
+# Shared keep-alive session so repeated POSTs reuse TCP/TLS connections instead of new handshakes per call
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4,
+                       pool_maxsize=16,
+                       max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504]))
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+
+# Static header dicts for the default API key, avoids one allocation per POST on the hot path
+_JSON_HEADERS = {"Authorization": f"ApiKey {ELK_TOKEN}", "Content-Type": "application/json"}
+_NDJSON_HEADERS = {"Authorization": f"ApiKey {ELK_TOKEN}", "Content-Type": "application/x-ndjson"}
+
+# Cache of monthly rollover index names, recomputed only when the month changes
+_INDEX_CACHE = {}
+
+
+def _monthly_index(index: str) -> str:
+    today = datetime.date.today()
+    key = (index, today.year * 100 + today.month)
+    if key not in _INDEX_CACHE:
+        _INDEX_CACHE[key] = f"{index}-{today:%Y%m}"
+    return _INDEX_CACHE[key]
+
 
 class Elastic:
 
@@ -23,6 +48,9 @@ class Elastic:
                  debug: bool = False
                  ):
 
+        # Deferred import, the static send_to_elastic* helpers do not need the elasticsearch client stack
+        from elasticsearch import Elasticsearch
+
         self.server = server
         self.api_key = api_key
         self.ssl_verify = ssl_verify
@@ -49,6 +77,7 @@ class Elastic:
                         ssl_verify: bool = json.loads(ELK_SSL_VERIFY.lower()),
                         iso_timestamp: str = None,
                         index_rollover: bool = True,
+                        session: requests.Session | None = None,
                         debug: bool = False):
         """
         Method to send single message to ELK
@@ -58,6 +87,7 @@ class Elastic:
         :param server: url of ELK server
         :param iso_timestamp: message timestamp
         :param index_rollover: if true, adds monthly indication to index name
+        :param session: optional requests session, defaults to the shared keep-alive session
         :param debug: flag for debug mode
         :return:
         """
@@ -71,7 +101,7 @@ class Elastic:
 
         # Create server url with relevant index pattern
         if index_rollover:
-            index = f"{index}-{datetime.datetime.today():%Y%m}"
+            index = _monthly_index(index)
         url = f"{server}/{index}/_doc"
 
         if id:
@@ -82,10 +112,11 @@ class Elastic:
             logger.debug(f"Sending data to {url}")
         if json_message.get('args', None):  # TODO revise if this is proper solution
             json_message.pop('args')
-        json_data = json.dumps(json_message, default=str, ensure_ascii=True, skipkeys=True)
-        headers = {"Authorization": f"ApiKey {api_key}", "Content-Type": "application/json"}
-        response = requests.post(url=url, data=json_data.encode(), headers=headers, verify=ssl_verify)
-        if json.loads(response.content).get('error'):
+        json_data = orjson.dumps(json_message, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        headers = _JSON_HEADERS if api_key == ELK_TOKEN else {"Authorization": f"ApiKey {api_key}", "Content-Type": "application/json"}
+        response = (session or _SESSION).post(url=url, data=json_data, headers=headers, verify=ssl_verify)
+        # Rejected documents come with a non-2xx status, no need to decode the response on the happy path
+        if not response.ok and orjson.loads(response.content).get('error'):
             logger.error(f"Send to Elasticsearch responded with error: {response.text}")
         if debug:
             logger.debug(f"ELK response: {response.content}")
@@ -104,6 +135,9 @@ class Elastic:
                              batch_size: int = int(BATCH_SIZE),
                              iso_timestamp: str | None = None,
                              index_rollover: bool = True,
+                             session: requests.Session | None = None,
+                             max_workers: int = int(BULK_MAX_WORKERS),
+                             target_batch_bytes: int = int(BULK_TARGET_BATCH_BYTES),
                              debug: bool = False):
         """
         Method to send bulk message to ELK
@@ -116,6 +150,9 @@ class Elastic:
         :param batch_size: maximum size of batch
         :param iso_timestamp: timestamp to be included in documents
         :param index_rollover: if true, adds monthly indication to index name
+        :param session: optional requests session, defaults to the shared keep-alive session
+        :param max_workers: maximum number of batch requests in flight concurrently
+        :param target_batch_bytes: flush a batch once its serialized payload reaches this size
         :param debug: flag for debug mode
         :return:
         """
@@ -133,36 +170,69 @@ class Elastic:
         if not iso_timestamp:
             iso_timestamp = datetime.datetime.utcnow().isoformat(sep="T")
 
-        # Adding timestamp value to messages
-        json_message_list = [{**element, '@timestamp': iso_timestamp} for element in json_message_list]
-
         # Define server url with relevant index pattern (monthly indication is added)
         if index_rollover:
-            index = f"{index}-{datetime.datetime.today():%Y%m}"
+            index = _monthly_index(index)
         url = f"{server}/{index}/_bulk"
 
         if id_from_metadata:
             id_separator = "_"
-            json_message_list = [value for element in json_message_list for value in ({"index": {"_index": index, "_id": __generate_id(element)}}, element)]
-        else:
-            json_message_list = [value for element in json_message_list for value in ({"index": {"_index": index}}, element)]
 
+        _dump_option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+        total = len(json_message_list)
+        plain_action_line = orjson.dumps({"index": {"_index": index}})
+
+        # Pack documents into batches by payload bytes (the _bulk sweet spot), with batch_size as a document cap
+        payloads = []
+        buffer = bytearray()
+        batch_start = 0
+        docs_in_buffer = 0
+        for element in json_message_list:
+            if id_from_metadata:
+                action_line = orjson.dumps({"index": {"_index": index, "_id": __generate_id(element)}})
+            else:
+                action_line = plain_action_line
+            # Set the timestamp in place, copying every document dict just for one key is wasteful
+            element['@timestamp'] = iso_timestamp
+            document_line = orjson.dumps(element, default=str, option=_dump_option)
+            if buffer and (len(buffer) + len(action_line) + len(document_line) + 2 > target_batch_bytes
+                           or docs_in_buffer >= batch_size):
+                payloads.append((batch_start, docs_in_buffer, bytes(buffer)))
+                batch_start += docs_in_buffer
+                docs_in_buffer = 0
+                buffer.clear()
+            buffer += action_line
+            buffer += b"\n"
+            buffer += document_line
+            buffer += b"\n"
+            docs_in_buffer += 1
+        if buffer:
+            payloads.append((batch_start, docs_in_buffer, bytes(buffer)))
+
+        headers = _NDJSON_HEADERS if api_key == ELK_TOKEN else {"Authorization": f"ApiKey {api_key}", "Content-Type": "application/x-ndjson"}
+        http_session = session or _SESSION
+
+        def _post_batch(payload: bytes):
+            return http_session.post(url=url, data=payload, timeout=None, headers=headers, verify=ssl_verify)
+
+        # Executing POSTs to push message batches into ELK concurrently (ingestion is I/O-bound)
         response_list = []
-        for batch in range(0, len(json_message_list), batch_size):
-            # Executing POST to push messages into ELK
-            if debug:
-                logger.debug(f"Sending batch ({batch}-{batch + batch_size})/{len(json_message_list)} to {url}")
-            headers = {"Authorization": f"ApiKey {api_key}", "Content-Type": "application/x-ndjson"}
-            response = requests.post(url=url,
-                                     data=(ndjson.dumps(json_message_list[batch:batch + batch_size])+"\n").encode(),
-                                     timeout=None,
-                                     headers=headers,
-                                     verify=ssl_verify)
-            if json.loads(response.content).get('errors'):
-                logger.error(f"Send to Elasticsearch responded with errors: {response.text}")
-            if debug:
-                logger.debug(f"ELK response: {response.content}")
-            response_list.append(response.ok)
+        with ThreadPoolExecutor(max_workers=min(max_workers, max(len(payloads), 1))) as executor:
+            futures = {executor.submit(_post_batch, payload): (batch, count) for batch, count, payload in payloads}
+            for future in as_completed(futures):
+                batch, count = futures[future]
+                if debug:
+                    logger.debug(f"Sent batch ({batch}-{batch + count})/{total} to {url}")
+                response = future.result()
+                # Happy-path bulk responses open with {"took":...,"errors":false,...}; a byte probe on the
+                # head of the body avoids re-parsing the whole multi-MB response when nothing failed
+                if not response.ok or b'"errors":false' not in response.content[:100]:
+                    if orjson.loads(response.content).get('errors'):
+                        logger.error(f"Send to Elasticsearch responded with errors: {response.text}")
+                if debug:
+                    logger.debug(f"ELK response: {response.content}")
+                response_list.append(response.ok)
 
         return all(response_list)
 
@@ -228,6 +298,7 @@ class HandlerSendToElastic:
                                                 server=self.server,
                                                 api_key=self.api_key,
                                                 index_rollover=self.index_rollover,
+                                                session=self.session,
                                                 debug=self.debug)
 
         logger.info(f"Message sending to Elastic successful: {response}")
@@ -1,15 +1,18 @@
-import requests
+from urllib.parse import urlencode
 from lxml import etree
 import minio
 from minio.commonconfig import Tags
 import urllib3
-import sys
+import os
 import mimetypes
 import re
 import config
 import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from aniso8601 import parse_datetime
 from common.config_parser import parse_app_properties
 from loguru import logger
@@ -18,13 +21,30 @@ urllib3.disable_warnings()
 
 parse_app_properties(globals(), config.paths.integrations.minio)
 
+# Compiled once, the credentials document is parsed on every token renewal
+_CREDENTIALS_XPATH = etree.XPath("//*[local-name()='Credentials']/*")
+
+# Collapses any run of slashes in one pass, replace('//', '/') missed triple slashes
+_SLASH_RE = re.compile(r"/{2,}")
+
+
+@functools.lru_cache(maxsize=256)
+def _guess_content_type(extension: str):
+    """Memoized content type lookup, mimetypes walks its extension maps on every call"""
+    return mimetypes.guess_type(f"object{extension}")[0]
+
 
 def renew_authentication_token(func):
     @functools.wraps(func)
     def wrapper(self, *args, **kwargs):
-        if datetime.now(timezone.utc) >= self.token_expiration - timedelta(seconds=int(TOKEN_RENEW_MARGIN)):  # 120s margin before token expiration
-            logger.warning("Authentication token going to expire soon, renewing token")
-            self._create_client()
+        # Compare against a monotonic deadline set at client creation, avoids datetime/timedelta
+        # allocations on every S3 call (120s margin before token expiration)
+        if time.monotonic() >= self._renew_at_monotonic:
+            with self._renew_lock:
+                # Re-check under the lock, parallel downloads may race here and only one should renew
+                if time.monotonic() >= self._renew_at_monotonic:
+                    logger.warning("Authentication token going to expire soon, renewing token")
+                    self._create_client()
         return func(self, *args, **kwargs)
 
     return wrapper
@@ -37,8 +57,14 @@ class S3Minio:
         self.username = username
         self.password = password
         self.token_expiration = datetime.now(timezone.utc)
+        self._renew_at_monotonic = 0.0
+        self._renew_lock = threading.Lock()
+        # Pool must cover peak download concurrency; block so excess requests wait for a pooled
+        # connection instead of opening throwaway sockets with a fresh TLS handshake each
         self.http_client = urllib3.PoolManager(
-                maxsize=int(MAXSIZE),
+                maxsize=max(int(MAXSIZE), int(DOWNLOAD_MAX_CONCURRENCY)),
+                block=True,
+                retries=urllib3.Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
                 cert_reqs='CERT_NONE',
             )
 
@@ -49,6 +75,8 @@ class S3Minio:
         """Connect to Minio"""
         credentials = self._get_credentials()
         self.token_expiration = parse_datetime(credentials['Expiration']).astimezone(timezone.utc)
+        seconds_to_expiration = (self.token_expiration - datetime.now(timezone.utc)).total_seconds()
+        self._renew_at_monotonic = time.monotonic() + seconds_to_expiration - int(TOKEN_RENEW_MARGIN)
         self.client = minio.Minio(endpoint=self.server,
                                   access_key=credentials['AccessKeyId'],
                                   secret_key=credentials['SecretAccessKey'],
@@ -74,15 +102,11 @@ class S3Minio:
         }
 
         # Sending request for temporary credentials and parsing it out from returned xml
-        response = requests.post(f"https://{self.server}", params=params, verify=False).content
-        credentials = {}
+        # Routed through the shared pool so the auth POST reuses an established TLS connection
+        response = self.http_client.request("POST", f"https://{self.server}?{urlencode(params)}").data
         root = etree.fromstring(response)
-        et = root.find("{*}AssumeRoleWithLDAPIdentityResult/{*}Credentials")
-        for element in et:
-            _, _, tag = element.tag.rpartition("}")
-            credentials[tag] = element.text
 
-        return credentials
+        return {element.tag.rpartition("}")[2]: element.text for element in _CREDENTIALS_XPATH(root)}
 
     @staticmethod
     def dict_to_tags(tags: dict):
@@ -94,10 +118,11 @@ class S3Minio:
 
     @renew_authentication_token
     def upload_object(self,
-                      file_path_or_file_object: str | BytesIO,
+                      file_path_or_file_object: str | os.PathLike | BytesIO,
                       bucket_name: str,
                       metadata: dict | None = None,
                       tags: dict | None = None,
+                      part_size: int = int(UPLOAD_PART_SIZE),
                       ):
         """
         Method to upload file to Minio storage
@@ -105,13 +130,18 @@ class S3Minio:
         :param bucket_name: bucket name
         :param metadata: object metadata
         :param tags: object tags
+        :param part_size: multipart part size in bytes for large objects
         :return: response from Minio
         """
         file_object = file_path_or_file_object
+        opened_here = False
 
-        if type(file_path_or_file_object) == str:
+        if isinstance(file_path_or_file_object, (str, os.PathLike)):
+            # sys.getsizeof on the handle gave the size of the Python object, not the file,
+            # which made minio fall back to slow length probing on a wrong stream length
+            length = os.path.getsize(file_path_or_file_object)
             file_object = open(file_path_or_file_object, "rb")
-            length = sys.getsizeof(file_object)
+            opened_here = True
         else:
             length = file_object.getbuffer().nbytes
 
@@ -127,30 +157,109 @@ class S3Minio:
 
         # TODO - check that bucket exists and it has access to it, maybe also try to create one
         logger.info(f"Uploading object to bucket {bucket_name}: {file_object.name}")
-        response = self.client.put_object(
-            bucket_name=bucket_name,
-            object_name=file_object.name,
-            data=file_object,
-            length=length,
-            content_type=mimetypes.guess_type(file_object.name)[0],
-            metadata=metadata,
-            tags=tags,
-        )
+        try:
+            response = self.client.put_object(
+                bucket_name=bucket_name,
+                object_name=file_object.name,
+                data=file_object,
+                length=length,
+                part_size=part_size,
+                content_type=_guess_content_type(os.path.splitext(file_object.name)[1].lower()),
+                metadata=metadata,
+                tags=tags,
+            )
+        finally:
+            if opened_here:
+                file_object.close()
 
         return response
 
     @renew_authentication_token
     def download_object(self, bucket_name: str, object_name: str):
         response = None
+        file_data = None
         try:
-            object_name = object_name.replace("//", "/")
+            object_name = _SLASH_RE.sub("/", object_name)
             file_data = self.client.get_object(bucket_name, object_name)
             response = file_data.read()
         except minio.error.S3Error as err:
             logger.error(f"Error downloading object {object_name} from bucket {bucket_name}: {err}", exc_info=True)
+        finally:
+            if file_data:
+                file_data.close()
+                file_data.release_conn()
 
         return response
 
+    @renew_authentication_token
+    def download_object_parallel(self,
+                                 bucket_name: str,
+                                 object_name: str,
+                                 chunk_size: int = int(DOWNLOAD_CHUNK_SIZE),
+                                 max_concurrency: int = int(DOWNLOAD_MAX_CONCURRENCY)):
+        """
+        Method to download object with concurrent ranged GET requests
+        Large objects are split into byte-range chunks fetched in parallel, small objects fall back to single GET
+        :param bucket_name: bucket name
+        :param object_name: object name
+        :param chunk_size: size of each byte-range chunk in bytes
+        :param max_concurrency: maximum number of parallel range requests
+        :return: object content in BytesIO buffer
+        """
+        object_name = _SLASH_RE.sub("/", object_name)
+        try:
+            stat = self.client.stat_object(bucket_name, object_name)
+        except minio.error.S3Error as err:
+            logger.error(f"Error downloading object {object_name} from bucket {bucket_name}: {err}", exc_info=True)
+            return None
+
+        buffer = BytesIO()
+
+        # Stream small objects directly into the buffer, avoiding the intermediate full bytes copy
+        if stat.size <= chunk_size:
+            file_data = None
+            try:
+                file_data = self.client.get_object(bucket_name, object_name)
+                for chunk in file_data.stream(1 << 20):
+                    buffer.write(chunk)
+            except minio.error.S3Error as err:
+                logger.error(f"Error downloading object {object_name} from bucket {bucket_name}: {err}", exc_info=True)
+                return None
+            finally:
+                if file_data:
+                    file_data.close()
+                    file_data.release_conn()
+            buffer.seek(0)
+            return buffer
+
+        # Fetch disjoint byte ranges in parallel and write them straight into the pre-sized buffer
+        # Match on ETag to guarantee all ranges come from the same object version
+        buffer.seek(stat.size - 1)
+        buffer.write(b"\0")
+        view = buffer.getbuffer()
+
+        def _fetch_range(offset: int):
+            length = min(chunk_size, stat.size - offset)
+            file_data = self.client.get_object(bucket_name, object_name,
+                                               offset=offset,
+                                               length=length,
+                                               request_headers={"If-Match": stat.etag})
+            view[offset:offset + length] = file_data.read()
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                futures = [executor.submit(_fetch_range, offset) for offset in range(0, stat.size, chunk_size)]
+                for future in futures:
+                    future.result()
+        except minio.error.S3Error as err:
+            logger.error(f"Error downloading object {object_name} from bucket {bucket_name}: {err}", exc_info=True)
+            return None
+        finally:
+            view.release()
+
+        buffer.seek(0)
+        return buffer
+
     @renew_authentication_token
     def object_exists(self, object_name: str, bucket_name: str) -> bool:
         """Check whether object exists in specified bucket by its object name"""
@@ -171,16 +280,12 @@ class S3Minio:
                      start_after: str | None = None,
                      include_user_meta: bool = True,
                      include_version:  bool = False):
-        """Return all object of specified bucket"""
-        objects = []
+        """Yield objects of specified bucket page by page, callers needing a list opt in with list(...)"""
         try:
-            response = self.client.list_objects(bucket_name, prefix, recursive, start_after, include_user_meta, include_version)
-            objects.extend(response)
+            yield from self.client.list_objects(bucket_name, prefix, recursive, start_after, include_user_meta, include_version)
         except minio.error.S3Error as err:
             logger.error(f"Error listing objects in bucket {bucket_name} with prefix {prefix}: {err}", exc_info=True)
 
-        return objects
-
     @renew_authentication_token
     def query_objects(self, bucket_name: str, metadata: dict = None, prefix: str = None, use_regex: bool = False):
         """Example: service.query_objects(prefix="IGM", metadata={'bamessageid': '20230215T1630Z-1D-LITGRID-001'})"""
@@ -190,35 +295,58 @@ class S3Minio:
         if not metadata:
             return objects
 
-        result_list = []
-        regex_hit = False
-        for object in objects:
-            object_metadata = self.client.stat_object(bucket_name, object.object_name).metadata
-
-            meta_match = True
+        # Compile each query pattern once instead of per (object, key) pair
+        compiled_patterns = {key: re.compile(value) for key, value in metadata.items()} if use_regex else None
+
+        # User metadata is already part of the list response, stat_object per object is an N+1 round-trip;
+        # HEAD only the objects the backend did not return metadata for, and do those in parallel.
+        # Keys are lowercased on the way in: the list response carries a plain case-sensitive dict
+        # (canonical X-Amz-Meta-... casing) while stat_object returns case-insensitive headers
+        objects = list(objects)
+        metadata_by_object = {obj.object_name: {key.lower(): value for key, value in obj.metadata.items()}
+                              for obj in objects if obj.metadata}
+        missing = [obj for obj in objects if obj.object_name not in metadata_by_object]
+        if missing:
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                stats = executor.map(lambda obj: self.client.stat_object(bucket_name, obj.object_name), missing)
+                for obj, stat in zip(missing, stats):
+                    metadata_by_object[obj.object_name] = {key.lower(): value for key, value in stat.metadata.items()}
+
+        def matches(object_metadata):
+            # Short-circuit on the first failing key; the previous regex_hit flag leaked between keys
+            # and kept evaluating every key for objects that could no longer match
             for query_key, query_value in metadata.items():
                 meta_value = object_metadata.get(f"x-amz-meta-{query_key}", None)
-                # meta_match true if it was true and meta_value equals query_value or regex was used and found
-                if meta_value:
-                    regex_hit = bool(re.search(pattern=query_value, string=meta_value)) if use_regex else False
-                meta_match = (meta_match and ((meta_value == query_value) or regex_hit))
+                if meta_value is None:
+                    return False
+                if use_regex:
+                    if not compiled_patterns[query_key].search(meta_value):
+                        return False
+                elif meta_value != query_value:
+                    return False
+            return True
 
-            if meta_match:
-                result_list.append(object)
-
-        return result_list
+        return [object for object in objects if matches(metadata_by_object[object.object_name])]
 
     def get_all_objects_name(self, bucket_name: str, prefix: str = None):
-        objects = self.client.list_objects(bucket_name=bucket_name, prefix=prefix,recursive=True)
-        list_elements = []
-        for obj in objects:
-            try:
-                object_name = obj.object_name.split("/")[-1]
-                list_elements.append(object_name)
-            except Exception as e:
-                logger.warning(f"Object name not present: {e}")
+        objects = self.client.list_objects(bucket_name=bucket_name, prefix=prefix, recursive=True)
+        # rsplit with maxsplit keeps only the last path segment without allocating the full split list
+        return [obj.object_name.rsplit("/", 1)[-1] for obj in objects if obj.object_name]
+
+
+_S3_SERVICE = None
+_S3_SERVICE_LOCK = threading.Lock()
+
 
-        return list_elements
+def get_s3() -> S3Minio:
+    """Process-wide S3Minio instance so services share one connection pool and token instead of each
+    holding their own PoolManager and TLS sessions"""
+    global _S3_SERVICE
+    if _S3_SERVICE is None:
+        with _S3_SERVICE_LOCK:
+            if _S3_SERVICE is None:
+                _S3_SERVICE = S3Minio()
+    return _S3_SERVICE
 
 
 if __name__ == '__main__':
@@ -1,10 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
+import numpy as np
 import pandas as pd
 import triplets
 from rao.crac import models
 import json
 from common.decorators import performance_counter
 
+SQRT3 = 1.7320508075688772
+
+
+def _debug_enabled() -> bool:
+    """True when any loguru handler would accept DEBUG records, checked once before hot loops"""
+    return logger.level("DEBUG").no >= logger._core.min_level
+
 
 class CracBuilder:
     """
@@ -18,11 +27,41 @@ class CracBuilder:
         self.network = network
         self.limits = None
         self._crac = None
+        self._tableview_cache = {}
 
         # TODO [TEMPORARY] exclude boundary set
         boundary_files = self.network[(self.network.KEY == 'label') & (self.network.VALUE.str.contains("ENTSOE"))]
         self.network = self.network[~self.network.INSTANCE_ID.isin(boundary_files.INSTANCE_ID)]
 
+        # Low-cardinality label columns as category: repeated KEY/INSTANCE_ID filters then compare
+        # integer codes instead of Python strings (VALUE and ID stay object, they carry the payload
+        # and merge keys consumed by the tableviews)
+        for frame in (self.data, self.network):
+            for column in ('KEY', 'INSTANCE_ID'):
+                if column in frame.columns:
+                    frame[column] = frame[column].astype('category')
+
+        # Snapshot of network element IDs for O(1) membership checks during consistency validation
+        self._existing_ids = frozenset(self.network.ID.unique())
+
+    def _tableview(self, source: str, view_type: str, name: str, string_to_number: bool = True):
+        """
+        Memoized type_tableview/key_tableview extraction. Every call scans the full triplestore
+        and build_crac can run several times on the same data (one CRAC per contingency).
+        :param source: 'data' or 'network'
+        :param view_type: 'type' or 'key'
+        :param name: class or key name to extract
+        :param string_to_number: passed through to triplets
+        :return: extracted tableview dataframe
+        """
+        cache_key = (source, view_type, name, string_to_number)
+        view = self._tableview_cache.get(cache_key)
+        if view is None:
+            frame = self.data if source == 'data' else self.network
+            view = getattr(frame, f"{view_type}_tableview")(name, string_to_number=string_to_number)
+            self._tableview_cache[cache_key] = view
+        return view
+
     @property
     def crac(self):
         if self._crac is None:
@@ -36,6 +75,10 @@ class CracBuilder:
 
     def get_limits(self):
 
+        # Limits depend only on the network model fixed at construction, compute them once per instance
+        if self.limits is not None:
+            return
+
         if self.network is None:
             logger.error("Network model is not provided. Cannot retrieve limits.")
             return
@@ -43,144 +86,151 @@ class CracBuilder:
         logger.info(f"Retrieving operational limits from network model")
 
         # Get Limit Sets
-        limits = self.network.type_tableview('OperationalLimitSet', string_to_number=False).reset_index()
+        limits = self._tableview('network', 'type', 'OperationalLimitSet', string_to_number=False).reset_index()
 
-        # Add OperationalLimits
-        limits = limits.merge(self.network.key_tableview('OperationalLimit.OperationalLimitSet').reset_index(),
-                              left_on='ID',
-                              right_on='OperationalLimit.OperationalLimitSet',
-                              suffixes=("_OperationalLimitSet", "_OperationalLimit"))
+        # Add OperationalLimits joined on the pre-indexed limit set reference
+        operational_limits = (self._tableview('network', 'key', 'OperationalLimit.OperationalLimitSet')
+                              .reset_index()
+                              .set_index('OperationalLimit.OperationalLimitSet'))
+        limits = limits.join(operational_limits, on='ID', how='inner',
+                             lsuffix='_OperationalLimitSet', rsuffix='_OperationalLimit')
 
-        # Add LimitTypes
-        limits = limits.merge(self.network.type_tableview("OperationalLimitType", string_to_number=False).reset_index(),
-                              right_on="ID", left_on="OperationalLimit.OperationalLimitType")
+        # Add LimitTypes (type tableviews are already indexed by ID)
+        limits = limits.join(self._tableview('network', 'type', 'OperationalLimitType', string_to_number=False),
+                             on='OperationalLimit.OperationalLimitType', how='inner', rsuffix='_OperationalLimitType')
 
         # Add link to equipment via Terminals
-        limits = limits.merge(self.network.type_tableview('Terminal', string_to_number=False).reset_index(),
-                              left_on="OperationalLimitSet.Terminal", right_on="ID", suffixes=("", "_Terminal"))
-
-        limits["ID_Equipment"] = None
-
-        # Get Equipment via terminal -> 'OperationalLimitSet.Terminal' -> 'Terminal.ConductingEquipment'
-        if 'Terminal.ConductingEquipment' in limits.columns:
-            limits["ID_Equipment"] = limits["ID_Equipment"].fillna(limits["Terminal.ConductingEquipment"])
-
-        # Get Equipment directly -> 'OperationalLimitSet.Equipment'
-        if 'OperationalLimitSet.Equipment' in limits.columns:
-            limits["ID_Equipment"] = limits["ID_Equipment"].fillna(limits['OperationalLimitSet.Equipment'])
+        limits = limits.join(self._tableview('network', 'type', 'Terminal', string_to_number=False),
+                             on='OperationalLimitSet.Terminal', how='inner', rsuffix='_Terminal')
+
+        # Get Equipment via terminal ('Terminal.ConductingEquipment') or directly ('OperationalLimitSet.Equipment')
+        # in a single pass instead of chained fillna scans
+        terminal_equipment = limits.get('Terminal.ConductingEquipment')
+        direct_equipment = limits.get('OperationalLimitSet.Equipment')
+        if terminal_equipment is not None and direct_equipment is not None:
+            limits["ID_Equipment"] = terminal_equipment.where(terminal_equipment.notna(), direct_equipment)
+        elif terminal_equipment is not None:
+            limits["ID_Equipment"] = terminal_equipment.copy()
+        elif direct_equipment is not None:
+            limits["ID_Equipment"] = direct_equipment.copy()
+        else:
+            limits["ID_Equipment"] = None
 
         # Add equipment type
         # limits = limits.merge(data.query("KEY == 'Type'"), left_on="ID_Equipment", right_on="ID", suffixes=("", "_Type"))
 
-        # Ensure that Active Power Limits column would be present
+        # Ensure that Active Power Limits column would be present as float64 NaN, pd.NA forces the object dtype path
         if "ActivePowerLimit.value" not in limits.columns:
-            limits["ActivePowerLimit.value"] = pd.NA
+            limits["ActivePowerLimit.value"] = np.full(len(limits), np.nan, dtype=np.float64)
 
-        # Get voltages on terminals to convert A limits to MW
-        limits = limits.merge(self.network.type_tableview("SvVoltage"), left_on="Terminal.TopologicalNode",
-                              right_on="SvVoltage.TopologicalNode", suffixes=("", "_SvVoltage"))
+        # Get voltages on terminals to convert A limits to MW; only the voltage magnitude is consumed
+        # downstream, so the join is projected to that single column
+        sv_voltages = self._tableview('network', 'type', 'SvVoltage').set_index('SvVoltage.TopologicalNode')[['SvVoltage.v']]
+        limits = limits.join(sv_voltages, on='Terminal.TopologicalNode', how='inner', rsuffix='_SvVoltage')
 
-        # Compute MW approximation where ActivePowerLimit is NaN and Current/Voltage are available
+        # Compute MW approximation where ActivePowerLimit is NaN and Current/Voltage are available,
+        # as a single numpy pass over pre-extracted arrays instead of three aligned .loc reads/writes
         if "CurrentLimit.value" in limits.columns and "SvVoltage.v" in limits.columns:
-            condition = limits["ActivePowerLimit.value"].isna() & limits["CurrentLimit.value"].notna() & limits["SvVoltage.v"].notna()
-            # Calculate MW and assign
-            limits.loc[condition, "ActivePowerLimit.value"] = round(
-                ((3 ** 0.5) * limits.loc[condition, "CurrentLimit.value"] * limits.loc[condition, "SvVoltage.v"]) / 1000, 1)
+            active_power = pd.to_numeric(limits["ActivePowerLimit.value"], errors="coerce").to_numpy(dtype=np.float64)
+            current = pd.to_numeric(limits["CurrentLimit.value"], errors="coerce").to_numpy(dtype=np.float64)
+            voltage = pd.to_numeric(limits["SvVoltage.v"], errors="coerce").to_numpy(dtype=np.float64)
+            megawatts = np.round(SQRT3 * current * voltage * 1e-3, 1)
+            limits["ActivePowerLimit.value"] = np.where(np.isnan(active_power) & ~np.isnan(current) & ~np.isnan(voltage),
+                                                        megawatts, active_power)
+
+        # Cache the limit type suffix with the limits, update_limits_from_network runs once per CRAC build
+        limits["_limit_type_suffix"] = limits["OperationalLimitType.limitType"].str.rsplit(".", n=1).str[-1].astype("category")
 
         self.limits = limits
 
     def update_limits_from_network(self,):
 
-        def _get_limit_fallback_to_patl(instance: object, primary: dict, fallback: dict):
-            value = primary.get(instance.networkElementId)
-            if value is None:
-                fallback_value = fallback.get(instance.networkElementId)
-                if fallback_value is not None:
-                    logger.warning(f"TATL limit is missing for {instance.name}, using PATL value instead")
-                    return fallback_value
-            return value
-
         if self.limits is None:
             self.get_limits()
 
         logger.info(f"Updating operational limits on CNECs from network model")
 
-        patl_limits = self.limits[self.limits["OperationalLimitType.limitType"].str.endswith(".patl")].groupby("ID_Equipment")
-        tatl_limits = self.limits[self.limits["OperationalLimitType.limitType"].str.endswith(".tatl")].groupby("ID_Equipment")
+        # PATL/TATL masks come from the suffix column cached by get_limits
+        limit_type_suffix = self.limits["_limit_type_suffix"]
+
+        # Aggregate all limit kinds in a single groupby pass per limit type instead of one min() per column
+        aggregations = {column: "min" for column in ("CurrentLimit.value", "ActivePowerLimit.value", "ApparentPowerLimit.value")
+                        if column in self.limits.columns}
+        patl_stats = self.limits[limit_type_suffix == "patl"].groupby("ID_Equipment", sort=False).agg(aggregations)
+        tatl_stats = self.limits[limit_type_suffix == "tatl"].groupby("ID_Equipment", sort=False).agg(aggregations)
 
         # Generate mean and max voltages for equipment
-        # voltages = patl_limits["SvVoltage.v"].mean().round(1).to_dict()
-        # max_voltage = patl_limits["SvVoltage.v"].max().round(1).to_dict()
-
-        patl_current_limits = {}
-        tatl_current_limits = {}
-        if "CurrentLimit.value" in self.limits.columns:
-            patl_current_limits = patl_limits["CurrentLimit.value"].min().to_dict()
-            tatl_current_limits = tatl_limits["CurrentLimit.value"].min().to_dict()
-
-        patl_active_power_limits = {}
-        tatl_active_power_limits = {}
-        if "ActivePowerLimit.value" in self.limits.columns:
-            patl_active_power_limits = patl_limits["ActivePowerLimit.value"].min().to_dict()
-            tatl_active_power_limits = tatl_limits["ActivePowerLimit.value"].min().to_dict()
-
-        patl_apparent_power_limits = {}
-        tatl_apparent_power_limits = {}
-        if "ApparentPowerLimit.value" in self.limits.columns:
-            patl_apparent_power_limits = patl_limits["ApparentPowerLimit.value"].min().to_dict()
-            tatl_apparent_power_limits = tatl_limits["ApparentPowerLimit.value"].min().to_dict()
-
-        for monitored_element in self._crac.flowCnecs:
-
-            # TODO figure out optimization that same CNEC on preventive and curative instance would be updated
-
-            # Set nominal voltage to operational voltages, taken from SV
-            # if operational_voltage := voltages.get(monitored_element.networkElementId):
-            #     # TODO add both sides of the equipment when building CRAC nominal voltages
-            #     if "_AT" in monitored_element.name:
-            #         max_op_voltage = max_voltage.get(monitored_element.networkElementId)
-            #         monitored_element.nominalV = [max_op_voltage]
-            #         logger.debug(f"Flow CNEC {monitored_element.name} [{monitored_element.instant}] max operational voltage selected: {max_op_voltage}")
-            #     else:
-            #         monitored_element.nominalV = [operational_voltage]
-            #         logger.debug(f"Flow CNEC {monitored_element.name} [{monitored_element.instant}] nominal voltage updated: {operational_voltage}")
-            # else:
-            #     logger.warning(f"Flow CNEC {monitored_element.name} operational voltage not available, using nominal")
-
-            # Select limits by instant of CNEC
-            if monitored_element.instant == "preventive":
-                current_limits = patl_current_limits
-                active_power_limits = patl_active_power_limits
-                apparent_power_limits = patl_apparent_power_limits
-            else:
-                current_limits = tatl_current_limits
-                active_power_limits = tatl_active_power_limits
-                apparent_power_limits = tatl_apparent_power_limits
-
-            # Get actual limits
-            if limit := _get_limit_fallback_to_patl(instance=monitored_element,
-                                                    primary=current_limits,
-                                                    fallback=patl_current_limits):
-                unit = "ampere"
-            elif limit := _get_limit_fallback_to_patl(instance=monitored_element,
-                                                      primary=active_power_limits,
-                                                      fallback=patl_active_power_limits):
-                unit = "megawatt"
-            elif limit := _get_limit_fallback_to_patl(instance=monitored_element,
-                                                      primary=apparent_power_limits,
-                                                      fallback=patl_apparent_power_limits):
-                unit = "apparent"
-            else:
+        # voltages = patl_stats["SvVoltage.v"].mean().round(1).to_dict()
+        # max_voltage = patl_stats["SvVoltage.v"].max().round(1).to_dict()
+
+        # Keep the aggregated limits as equipment-indexed series: reindexing against the CNEC element
+        # ids gives branchless vector access without materializing one dict per limit kind
+        def _limit_series(stats: pd.DataFrame, column: str) -> pd.Series:
+            return stats[column] if column in stats.columns else pd.Series(dtype=float)
+
+        # TODO figure out optimization that same CNEC on preventive and curative instance would be updated
+
+        flow_cnecs = self._crac.flowCnecs
+        if not flow_cnecs:
+            return
+
+        element_ids = pd.Index([cnec.networkElementId for cnec in flow_cnecs])
+        preventive_mask = np.array([cnec.instant == "preventive" for cnec in flow_cnecs], dtype=bool)
+
+        def _limit_values(patl: pd.Series, tatl: pd.Series):
+            # PATL for preventive, TATL for curative with fallback to PATL (flagged for the warning)
+            patl_values = pd.to_numeric(patl.reindex(element_ids), errors="coerce").to_numpy(dtype=float)
+            tatl_values = pd.to_numeric(tatl.reindex(element_ids), errors="coerce").to_numpy(dtype=float)
+            values = np.where(preventive_mask, patl_values, tatl_values)
+            fallback = ~preventive_mask & np.isnan(values) & ~np.isnan(patl_values)
+            return np.where(fallback, patl_values, values), fallback
+
+        current_array, current_fallback = _limit_values(_limit_series(patl_stats, "CurrentLimit.value"),
+                                                        _limit_series(tatl_stats, "CurrentLimit.value"))
+        active_array, active_fallback = _limit_values(_limit_series(patl_stats, "ActivePowerLimit.value"),
+                                                     _limit_series(tatl_stats, "ActivePowerLimit.value"))
+        apparent_array, apparent_fallback = _limit_values(_limit_series(patl_stats, "ApparentPowerLimit.value"),
+                                                          _limit_series(tatl_stats, "ApparentPowerLimit.value"))
+
+        # Resolve limit, unit and fallback flag for all CNECs with numpy selection so the remaining
+        # loop does nothing but assign thresholds to the models
+        unit_conditions = [~np.isnan(current_array) & (current_array != 0),
+                           ~np.isnan(active_array) & (active_array != 0),
+                           ~np.isnan(apparent_array) & (apparent_array != 0)]
+        unit_names = ("ampere", "megawatt", "apparent")
+        unit_codes = np.select(unit_conditions, [0, 1, 2], default=-1)
+        limit_array = np.select(unit_conditions, [current_array, active_array, apparent_array], default=np.nan)
+        fallback_array = np.select(unit_conditions,
+                                   [current_fallback, active_fallback, apparent_fallback],
+                                   default=False)
+
+        # Sibling CNECs of the same network element resolve to the same limit (once per instant kind),
+        # so identical thresholds are built once and shared; the models never mutate a threshold in
+        # place, they only replace the list
+        threshold_cache = {}
+        for monitored_element, limit, unit_code, used_fallback in zip(flow_cnecs, limit_array, unit_codes, fallback_array):
+
+            if unit_code < 0:
                 logger.warning(f"Limit not found for {monitored_element.name} with element id: {monitored_element.networkElementId}")
                 continue
 
-            # Set update thresholds (limits)
-            monitored_element.thresholds = [models.Threshold(max=limit, min=limit * -1, side=1, unit=unit)]
+            if used_fallback:
+                logger.warning(f"TATL limit is missing for {monitored_element.name}, using PATL value instead")
+
+            # Set update thresholds (limits); values come out of the numpy selection above already
+            # typed, so model_construct skips one pydantic validation pass per CNEC
+            limit = float(limit)
+            threshold = threshold_cache.get((limit, unit_code))
+            if threshold is None:
+                threshold = models.Threshold.model_construct(
+                    max=limit, min=limit * -1, side=1, unit=unit_names[unit_code])
+                threshold_cache[(limit, unit_code)] = threshold
+            monitored_element.thresholds = [threshold]
 
     def process_contingencies(self, specific_contingencies: list | None = None):
 
-        contingency_equipment = self.data.type_tableview("ContingencyEquipment", string_to_number=False)
-        contingencies = self.data.key_tableview("Contingency.normalMustStudy", string_to_number=False)
+        contingency_equipment = self._tableview('data', 'type', 'ContingencyEquipment', string_to_number=False)
+        contingencies = self._tableview('data', 'key', 'Contingency.normalMustStudy', string_to_number=False)
         contingencies = contingencies.merge(contingency_equipment,
                                             left_on="IdentifiedObject.mRID",
                                             right_on="ContingencyElement.Contingency",
@@ -193,21 +243,31 @@ class CracBuilder:
                 logger.warning(f"No contingencies found for specified IDs: {specific_contingencies}")
                 return
 
-        for mrid, data in contingencies.groupby("IdentifiedObject.mRID_ContingencyElement"):
-            name = data["IdentifiedObject.name_ContingencyElement"].iloc[0]
-            contingency_type = data["Type_ContingencyElement"].iloc[0]
+        # Equipment existence is checked once over the whole frame, then folded per contingency by the
+        # same aggregation pass that collects names, types and equipment lists
+        contingencies['_equipment_exists'] = contingencies['ContingencyEquipment.Equipment'].isin(self._existing_ids)
+        aggregated = contingencies.groupby("IdentifiedObject.mRID_ContingencyElement", sort=False).agg(
+            name=("IdentifiedObject.name_ContingencyElement", "first"),
+            contingency_type=("Type_ContingencyElement", "first"),
+            equipment_ids=("ContingencyEquipment.Equipment", list),
+            equipment_exists=("_equipment_exists", "all"),
+        )
+
+        debug = _debug_enabled()
+        for mrid, name, contingency_type, equipment_ids, equipment_exists in aggregated.itertuples(name=None):
 
             # TODO [TEMPORARY] - perform consistency check
-            if not all(data['ContingencyEquipment.Equipment'].isin(self.network.ID)):
+            if not equipment_exists:
                 logger.warning(f"At least one of the contingency equipment does not exist in network model: {name}")
 
-            contingency = models.Contingency(
+            contingency = models.Contingency.model_construct(
                 id=mrid,
                 name=name,
-                networkElementsIds=data['ContingencyEquipment.Equipment'].to_list()
+                networkElementsIds=equipment_ids,
             )
             self._crac.contingencies.append(contingency)
-            logger.debug(f"Added contingency of type {contingency_type}: {name}")
+            if debug:
+                logger.debug(f"Added contingency of type {contingency_type}: {name}")
 
     def process_cnecs(self):
         """
@@ -215,17 +275,17 @@ class CracBuilder:
         This process always looks in already defined contingencies to have in synchronized.
         """
 
-        assessed_elements = self.data.type_tableview("AssessedElement", string_to_number=False)
+        assessed_elements = self._tableview('data', 'type', 'AssessedElement', string_to_number=False)
 
         # TODO [TEMPORARY] - perform consistency check
-        missing = assessed_elements[~assessed_elements['AssessedElement.ConductingEquipment'].isin(self.network.ID)]
+        missing = assessed_elements[~assessed_elements['AssessedElement.ConductingEquipment'].isin(self._existing_ids)]
         for _, row in missing.iterrows():
             logger.warning(f"Assessed element does not exist in network model: {row['IdentifiedObject.name']}")
         assessed_elements = assessed_elements.drop(index=missing.index)
 
         # TODO [TEMPORARY] - exclude 3W transformers
-        _power_transformers = self.network.type_tableview('PowerTransformer')
-        _transformer_ends = self.network.type_tableview('PowerTransformerEnd')
+        _power_transformers = self._tableview('network', 'type', 'PowerTransformer')
+        _transformer_ends = self._tableview('network', 'type', 'PowerTransformerEnd')
         _power_transformers = _power_transformers.merge(
             _transformer_ends['PowerTransformerEnd.PowerTransformer'].value_counts(),
             left_index=True,
@@ -238,49 +298,77 @@ class CracBuilder:
             logger.warning(f"Assessed element excluded as 3W transformers not supported: {row['IdentifiedObject.name']}")
         assessed_elements = assessed_elements.drop(index=exclude.index)
 
-        for ae in assessed_elements.to_dict('records'):
-
-            # Exclude assessed elements which normalEnabled = false
-            if ae.get('AssessedElement.normalEnabled', 'false') == 'false':
-                logger.warning(f"Assessed element excluded due to 'normalEnabled' is false or missing: {ae['IdentifiedObject.name']}")
-                continue
-
-            # Get flag whether assessed element should be included in preventive state
-            in_base_case = ae.get("AssessedElement.inBaseCase", "false").lower() == 'true'
-
-            # Define whether element secured/scanned
-            secured = bool(ae.get("AssessedElement.SecuredForRegion", False))
-            scanned = bool(ae.get("AssessedElement.ScannedForRegion", False))
-
-            # Create CNEC object for assessed element
-            cnec = models.FlowCnec(
-                id=f"{ae['IdentifiedObject.mRID']}",
-                name=ae['IdentifiedObject.name'],
-                description=ae['IdentifiedObject.description'] or "",
-                networkElementId=ae['AssessedElement.ConductingEquipment'],
-                operator=ae['AssessedElement.AssessedSystemOperator'],
-                thresholds=[models.Threshold()],
-                optimized=secured,
-                monitored=scanned,
+        # Exclude assessed elements which normalEnabled = false with a boolean mask instead of per-row checks
+        normal_enabled = assessed_elements.get('AssessedElement.normalEnabled')
+        if normal_enabled is not None:
+            disabled_mask = normal_enabled.eq('false')
+        else:
+            disabled_mask = pd.Series(True, index=assessed_elements.index)
+        for name in assessed_elements.loc[disabled_mask, 'IdentifiedObject.name']:
+            logger.warning(f"Assessed element excluded due to 'normalEnabled' is false or missing: {name}")
+        assessed_elements = assessed_elements[~disabled_mask]
+
+        # Get flag whether assessed elements should be included in preventive state
+        in_base_case_values = assessed_elements.get('AssessedElement.inBaseCase')
+        if in_base_case_values is not None:
+            in_base_case_mask = in_base_case_values.astype(str).str.lower().eq('true')
+        else:
+            in_base_case_mask = pd.Series(False, index=assessed_elements.index)
+
+        # Secured/scanned flags, defaulting to False when the region columns are absent
+        secured_values = assessed_elements.get('AssessedElement.SecuredForRegion')
+        if secured_values is None:
+            secured_values = pd.Series(False, index=assessed_elements.index)
+        scanned_values = assessed_elements.get('AssessedElement.ScannedForRegion')
+        if scanned_values is None:
+            scanned_values = pd.Series(False, index=assessed_elements.index)
+
+        cnec_columns = ['IdentifiedObject.mRID', 'IdentifiedObject.name', 'IdentifiedObject.description',
+                        'AssessedElement.ConductingEquipment', 'AssessedElement.AssessedSystemOperator']
+        contingencies = self._crac.contingencies
+        debug = _debug_enabled()
+        base_cnecs = []
+        flow_cnecs = []
+        for (mrid, name, description, equipment_id, operator), in_base_case, secured, scanned in zip(
+                assessed_elements[cnec_columns].itertuples(index=False, name=None),
+                in_base_case_mask, secured_values, scanned_values):
+
+            # Create CNEC object for assessed element; fields come from typed frame columns so
+            # model_construct skips the per-row validation pass
+            cnec = models.FlowCnec.model_construct(
+                id=f"{mrid}",
+                name=name,
+                description=description or "",
+                networkElementId=equipment_id,
+                operator=operator,
+                thresholds=[models.Threshold.model_construct()],
+                optimized=bool(secured),
+                monitored=bool(scanned),
             )
+            base_cnecs.append(cnec)
 
-            # Include CNEC in preventive state if defined
+            # Include CNEC in preventive state if defined; the state variants reuse the base CNEC's
+            # field dict through model_construct as well
             if in_base_case:
-                cnec_preventive = cnec.model_copy(
-                    update={"instant": "preventive", "id": f"{ae['IdentifiedObject.mRID']}-preventive"}
+                cnec_preventive = models.FlowCnec.model_construct(
+                    **{**cnec.__dict__, "instant": "preventive", "id": f"{mrid}-preventive"}
                 )
-                self._crac.flowCnecs.append(cnec_preventive)
-                logger.debug(f"Added CNEC {ae['IdentifiedObject.name']} for preventive state")
+                flow_cnecs.append(cnec_preventive)
+                if debug:
+                    logger.debug(f"Added CNEC {name} for preventive state")
             else:
-                logger.warning(f"Assessed element excluded from preventive state due to 'inBaseCase' is false: {ae['IdentifiedObject.name']}")
+                logger.warning(f"Assessed element excluded from preventive state due to 'inBaseCase' is false: {name}")
+
+        # Curative CNECs are the cross product of assessed elements and contingencies, built in one
+        # comprehension and added with a single extend instead of nested per-element appends
+        flow_cnecs.extend(
+            models.FlowCnec.model_construct(
+                **{**cnec.__dict__, "contingencyId": contingency.id, "instant": "curative", "id": f"{cnec.id}-curative"})
+            for cnec in base_cnecs for contingency in contingencies
+        )
+        logger.debug(f"Added {len(base_cnecs) * len(contingencies)} curative CNECs across {len(contingencies)} contingencies")
 
-            # Include curative CNEC for each contingency defined
-            for contingency in self._crac.contingencies:
-                cnec_curative = cnec.model_copy(
-                    update={"contingencyId": contingency.id, "instant": "curative", "id": f"{ae['IdentifiedObject.mRID']}-curative"}
-                )
-                self._crac.flowCnecs.append(cnec_curative)
-                logger.debug(f"Added CNEC {ae['IdentifiedObject.name']} for curative state on contingency: {contingency.name}")
+        self._crac.flowCnecs.extend(flow_cnecs)
 
     def process_remedial_actions(self):
         """
@@ -294,95 +382,129 @@ class CracBuilder:
             return "open" if value == "close" else "close"
 
         # Grid state alteration remedial actions
-        grid_state_alteration = self.data.key_tableview("GridStateAlteration.GridStateAlterationRemedialAction",
-                                                        string_to_number=False)
-        remedial_actions = self.data.type_tableview("GridStateAlterationRemedialAction", string_to_number=False)
+        grid_state_alteration = self._tableview('data', 'key', 'GridStateAlteration.GridStateAlterationRemedialAction',
+                                               string_to_number=False)
+        remedial_actions = self._tableview('data', 'type', 'GridStateAlterationRemedialAction', string_to_number=False)
         remedial_actions = remedial_actions.merge(grid_state_alteration,
                                                   left_on="IdentifiedObject.mRID",
                                                   right_on="GridStateAlteration.GridStateAlterationRemedialAction",
                                                   suffixes=("_GridStateAlterationRemedialAction", "_GridStateAlteration"))
-        property_ranges = self.data.type_tableview("StaticPropertyRange", string_to_number=False)
+        property_ranges = self._tableview('data', 'type', 'StaticPropertyRange', string_to_number=False)
+
+        # First normal value per grid state alteration, resolved from a dict instead of scanning property ranges per action
+        normal_values = (property_ranges
+                         .drop_duplicates('RangeConstraint.GridStateAlteration')
+                         .set_index('RangeConstraint.GridStateAlteration')['RangeConstraint.normalValue']
+                         .to_dict())
+
+        # Direction suffixes per grid state alteration, precomputed the same way so the per-group
+        # validation below is a dict union instead of another property range scan
+        direction_suffixes = property_ranges['RangeConstraint.direction'].str.rsplit('.', n=1).str[-1]
+        directions_by_alteration = (direction_suffixes
+                                    .groupby(property_ranges['RangeConstraint.GridStateAlteration'], sort=False)
+                                    .agg(set)
+                                    .to_dict())
+
+        # Ensure optional action columns exist so rows can be iterated as plain tuples
+        action_columns = ['Type_GridStateAlteration',
+                          'IdentifiedObject.mRID_GridStateAlteration',
+                          'IdentifiedObject.name_GridStateAlteration',
+                          'TopologyAction.Equipment',
+                          'ShuntCompensatorModification.ShuntCompensator']
+        for column in action_columns:
+            if column not in remedial_actions.columns:
+                remedial_actions[column] = None
+
+        # One aggregation pass collects the per-remedial-action header fields, instead of four
+        # .iloc[0] lookups per group when the NetworkAction is built
+        grouped = remedial_actions.groupby("IdentifiedObject.mRID_GridStateAlterationRemedialAction", sort=False)
+        remedial_action_meta = grouped.agg(
+            name=("IdentifiedObject.name_GridStateAlterationRemedialAction", "first"),
+            operator=("RemedialAction.RemedialActionSystemOperator", "first"),
+            kind=("RemedialAction.kind", "first"),
+        )
 
-        for mrid, data in remedial_actions.groupby("IdentifiedObject.mRID_GridStateAlterationRemedialAction"):
+        for (mrid, data), (_, ra_name, ra_operator, ra_kind) in zip(grouped, remedial_action_meta.itertuples(name=None)):
 
-            # Get relevant property ranges for the remedial action
-            ranges = property_ranges[property_ranges['RangeConstraint.GridStateAlteration'].isin(data['IdentifiedObject.mRID_GridStateAlteration'])]
-            # Validate whether all alterations similar direction attribute of property ranges
-            directions = ranges['RangeConstraint.direction'].apply(lambda x: x.split(".")[-1])
-            if len(directions.unique()) > 1:
+            # Validate whether all alterations carry a similar direction attribute on their property ranges
+            directions = set()
+            for alteration in data['IdentifiedObject.mRID_GridStateAlteration']:
+                directions |= directions_by_alteration.get(alteration, set())
+            if len(directions) > 1:
                 logger.warning(f"Remedial action contains alterations with different property range directions: {mrid}")
                 logger.warning(f"Not supported by CRAC builder, ignoring remedial action")
                 continue
 
-            # Create network elements property modification
-            actions = []
-            for action in data.to_dict("records"):
+            # Create network elements property modification, bucketed by action kind as they are
+            # built so no isinstance split pass is needed afterwards
+            terminal_actions = []
+            shunt_actions = []
+            for action_type, alteration_mrid, alteration_name, topology_equipment, shunt_compensator in \
+                    data[action_columns].itertuples(index=False, name=None):
 
                 # Get type of alteration action
-                action_type = action.get("Type_GridStateAlteration", None)
-                if action_type is None:
-                    logger.warning(f"Grid state alteration type is unknown or not supported: {action['IdentifiedObject.mRID_GridStateAlteration']}")
+                if action_type is None or pd.isna(action_type):
+                    logger.warning(f"Grid state alteration type is unknown or not supported: {alteration_mrid}")
                     continue
 
-                # Get relevant property ranges for the action
-                ranges = property_ranges[property_ranges['RangeConstraint.GridStateAlteration'] == action['IdentifiedObject.mRID_GridStateAlteration']]
-                if ranges.empty:
-                    logger.warning(f"No relevant property ranges found for {action_type}: {action['IdentifiedObject.mRID_GridStateAlteration']}")
+                # Get relevant property range normal value for the action
+                # TODO Need support if multiple property ranges are defined, currently the first range's normal value is used
+                if alteration_mrid in normal_values:
+                    normal_value = normal_values[alteration_mrid]
+                else:
+                    logger.warning(f"No relevant property ranges found for {action_type}: {alteration_mrid}")
                     logger.warning(f"Using default property range value: 0")
                     normal_value = 0
-                else:
-                    # TODO Need support if multiple property ranges are defined
-                    # Use the first range's normal value
-                    normal_value = ranges.iloc[0]['RangeConstraint.normalValue']
 
                 # TODO create a mapping table of supported action type
                 # TODO give normal value under generic name like "normalValue" to models and handle with alias
                 if action_type == 'TopologyAction':
                     # TODO map different types of actions, depending on current state of equipment (might need SIS NC profile implementation)
-                    element_id = action.get("TopologyAction.Equipment")
+                    element_id = topology_equipment
                     referenced_action = models.TerminalsAction
+                    bucket = terminal_actions
                 elif action_type == 'ShuntCompensatorModification':
-                    element_id = action.get("ShuntCompensatorModification.ShuntCompensator")
+                    element_id = shunt_compensator
                     referenced_action = models.ShuntCompensatorPositionAction
+                    bucket = shunt_actions
                 else:
                     logger.warning(f"Grid state alteration type is not supported: {action_type}")
                     continue
 
-                # TODO [TEMPORARY] - perform consistency check of action (not optimal doing one by one)
-                if element_id not in self.network.ID.values:
-                    logger.warning(f"Alteration equipment of remedial action does not exist in network model: {action['IdentifiedObject.name_GridStateAlteration']}")
+                # TODO [TEMPORARY] - perform consistency check of action
+                if element_id not in self._existing_ids:
+                    logger.warning(f"Alteration equipment of remedial action does not exist in network model: {alteration_name}")
                     continue
 
                 # Create action object
-                action = referenced_action(networkElementId=element_id, normalValue=normal_value)
-                actions.append(action)
+                bucket.append(referenced_action(networkElementId=element_id, normalValue=normal_value))
 
             # Create network action object if any of the actions were created
-            if not actions:
+            if not terminal_actions and not shunt_actions:
                 logger.warning(f"No actions available for GridStateAlterationRemedialAction: {mrid}")
                 continue
 
             network_action = models.NetworkAction(
-                id=data['IdentifiedObject.mRID_GridStateAlterationRemedialAction'].iloc[0],
-                name=data['IdentifiedObject.name_GridStateAlterationRemedialAction'].iloc[0],
-                operator=data['RemedialAction.RemedialActionSystemOperator'].iloc[0],
+                id=mrid,
+                name=ra_name,
+                operator=ra_operator,
                 onInstantUsageRules=[
                     {
                         "usageMethod": "available",
-                        "instant": data["RemedialAction.kind"].iloc[0].split(".")[-1]
+                        "instant": ra_kind.split(".")[-1]
                     }
                 ],
-                terminalsConnectionActions=[i for i in actions if isinstance(i, models.TerminalsAction)],
-                shuntCompensatorPositionActions=[i for i in actions if isinstance(i, models.ShuntCompensatorPositionAction)],
+                terminalsConnectionActions=terminal_actions,
+                shuntCompensatorPositionActions=shunt_actions,
             )
             self._crac.networkActions.append(network_action)
 
             # Check whether directions is "upAndDown", then multiple network actions have to be defined in CRAC
-            if directions.unique().item() == "upAndDown" and getattr(network_action, "terminalsConnectionActions", None):
+            if directions == {"upAndDown"} and getattr(network_action, "terminalsConnectionActions", None):
                 logger.debug(f"Remedial action defined with 'upAndDown' direction, adding opposite terminal connection actions")
-                _opposite_terminal_actions = [x.model_copy(update={"actionType": _get_opposite_terminal_connection_value(x.actionType)}) for x in actions]
+                _opposite_terminal_actions = [x.model_copy(update={"actionType": _get_opposite_terminal_connection_value(x.actionType)}) for x in terminal_actions]
                 _updates = {
-                    "id": f"{data['IdentifiedObject.mRID_GridStateAlterationRemedialAction'].iloc[0]}-opposite-direction",
+                    "id": f"{mrid}-opposite-direction",
                     "terminalsConnectionActions": _opposite_terminal_actions,
                 }
                 opposite_network_action = network_action.model_copy(update=_updates)
@@ -394,10 +516,18 @@ class CracBuilder:
         # Initialize CRAC object
         self._crac = models.Crac()  # TODO can be replaced with separate function also need to include some general parameters
 
-        # Process contingencies, CNECs and remedial actions
-        self.process_contingencies(specific_contingencies=contingency_ids)
-        self.process_cnecs()
-        self.process_remedial_actions()
+        # Process contingencies, limits and remedial actions concurrently: each phase only reads
+        # self.data/self.network and writes its own CRAC sublist (or self.limits), and the pandas
+        # work inside releases the GIL. CNECs need the contingencies, the limits update needs both
+        # the CNECs and the limits, so those stay ordered.
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            contingencies_future = executor.submit(self.process_contingencies, contingency_ids)
+            limits_future = executor.submit(self.get_limits)
+            remedial_actions_future = executor.submit(self.process_remedial_actions)
+            contingencies_future.result()
+            self.process_cnecs()
+            remedial_actions_future.result()
+            limits_future.result()
         self.update_limits_from_network()
 
         return self.crac
@@ -1,32 +1,44 @@
+import numpy
 import pandas
 import triplets
 import json
 from loguru import logger
 
+try:
+    import orjson  # much faster dump/load for large CRACs
+except ImportError:
+    orjson = None
+
 
 def get_limits(data):
 
     # Get Limit Sets
     limits = data.type_tableview('OperationalLimitSet', string_to_number=False).reset_index()
 
-    # Add OperationalLimits
-    limits = limits.merge(data.key_tableview('OperationalLimit.OperationalLimitSet').reset_index(), left_on='ID', right_on='OperationalLimit.OperationalLimitSet', suffixes=("_OperationalLimitSet", "_OperationalLimit"))
+    # Add OperationalLimits (right-hand frames are indexed on their join key so joins skip the hash build of merge)
+    operational_limits = data.key_tableview('OperationalLimit.OperationalLimitSet').reset_index().set_index('OperationalLimit.OperationalLimitSet')
+    limits = limits.join(operational_limits, on='ID', how='inner', lsuffix='_OperationalLimitSet', rsuffix='_OperationalLimit')
 
     # Add LimitTypes
-    limits = limits.merge(data.type_tableview("OperationalLimitType", string_to_number=False).reset_index(), right_on="ID", left_on="OperationalLimit.OperationalLimitType")
+    limit_types = data.type_tableview("OperationalLimitType", string_to_number=False)
+    limits = limits.join(limit_types, on="OperationalLimit.OperationalLimitType", how='inner', rsuffix='_OperationalLimitType', validate='m:1')
 
     # Add link to equipment via Terminals
-    limits = limits.merge(data.type_tableview('Terminal', string_to_number=False).reset_index(), left_on="OperationalLimitSet.Terminal", right_on="ID", suffixes=("", "_Terminal"))
-
-    limits["ID_Equipment"] = None
-
-    # Get Equipment via terminal -> 'OperationalLimitSet.Terminal' -> 'Terminal.ConductingEquipment'
-    if 'Terminal.ConductingEquipment' in limits.columns:
-        limits["ID_Equipment"] = limits["ID_Equipment"].fillna(limits["Terminal.ConductingEquipment"])
-
-    # Get Equipment directly -> 'OperationalLimitSet.Equipment'
-    if 'OperationalLimitSet.Equipment' in limits.columns:
-        limits["ID_Equipment"] = limits["ID_Equipment"].fillna(limits['OperationalLimitSet.Equipment'])
+    terminals = data.type_tableview('Terminal', string_to_number=False)
+    limits = limits.join(terminals, on="OperationalLimitSet.Terminal", how='inner', rsuffix='_Terminal', validate='m:1')
+
+    # Get Equipment via terminal ('Terminal.ConductingEquipment') or directly ('OperationalLimitSet.Equipment')
+    # in a single pass instead of chained fillna scans
+    terminal_equipment = limits.get('Terminal.ConductingEquipment')
+    direct_equipment = limits.get('OperationalLimitSet.Equipment')
+    if terminal_equipment is not None and direct_equipment is not None:
+        limits["ID_Equipment"] = terminal_equipment.where(terminal_equipment.notna(), direct_equipment)
+    elif terminal_equipment is not None:
+        limits["ID_Equipment"] = terminal_equipment.copy()
+    elif direct_equipment is not None:
+        limits["ID_Equipment"] = direct_equipment.copy()
+    else:
+        limits["ID_Equipment"] = None
 
     # Add equipment type
     #limits = limits.merge(data.query("KEY == 'Type'"), left_on="ID_Equipment", right_on="ID", suffixes=("", "_Type"))
@@ -41,76 +53,92 @@ def update_limits(models, crac_to_update):
     limits = get_limits(data=data)
 
     # Get voltages on terminals to convert A limits to MW
-    limits = limits.merge(data.type_tableview("SvVoltage"), left_on="Terminal.TopologicalNode", right_on="SvVoltage.TopologicalNode", suffixes=("", "_SvVoltage"))
+    limits = limits.merge(data.type_tableview("SvVoltage"), left_on="Terminal.TopologicalNode", right_on="SvVoltage.TopologicalNode", suffixes=("", "_SvVoltage"), copy=False, sort=False)
 
-    # Ensure that Active Power Limits column would be present
+    # Ensure that Active Power Limits column would be present as float64 NaN, pandas.NA forces the object dtype path
     if "ActivePowerLimit.value" not in limits.columns:
-        limits["ActivePowerLimit.value"] = pandas.NA
+        limits["ActivePowerLimit.value"] = numpy.full(len(limits), numpy.nan, dtype=numpy.float64)
 
     # Compute MW approximation where ActivePowerLimit is NaN and Current/Voltage are available
     if "CurrentLimit.value" in limits.columns and "SvVoltage.v" in limits.columns:
-        condition = limits["ActivePowerLimit.value"].isna() & limits["CurrentLimit.value"].notna() & limits["SvVoltage.v"].notna()
-        # Calculate MW and assign
-        limits.loc[condition, "ActivePowerLimit.value"] = round(3**0.5 * limits.loc[condition, "CurrentLimit.value"] * limits.loc[condition, "SvVoltage.v"] / 1000, 1)
+        # Run the conversion on plain numpy arrays, boolean-mask indexing on the frame is much slower at scale
+        active_power = pandas.to_numeric(limits["ActivePowerLimit.value"], errors="coerce").to_numpy(dtype=float)
+        current = pandas.to_numeric(limits["CurrentLimit.value"], errors="coerce").to_numpy(dtype=float)
+        voltage = pandas.to_numeric(limits["SvVoltage.v"], errors="coerce").to_numpy(dtype=float)
+        megawatts = numpy.round(numpy.sqrt(3) * current * voltage / 1000, 1)
+        limits["ActivePowerLimit.value"] = numpy.where(numpy.isnan(active_power) & ~numpy.isnan(current) & ~numpy.isnan(voltage), megawatts, active_power)
+
+    # Precompute the limit type suffix once and filter with categorical equality instead of per-row endswith
+    limit_type_suffix = limits["OperationalLimitType.limitType"].str.rsplit(".", n=1).str[-1].astype("category")
+
+    # Aggregate all needed statistics in a single groupby pass per limit kind
+    aggregations = {"SvVoltage.v": "mean"}
+    if "CurrentLimit.value" in limits.columns:
+        aggregations["CurrentLimit.value"] = "min"
+    if "ActivePowerLimit.value" in limits.columns:
+        aggregations["ActivePowerLimit.value"] = "min"
 
-    patl_limits = limits[limits["OperationalLimitType.limitType"].str.endswith(".patl")].groupby("ID_Equipment")
-    tatl_limits = limits[limits["OperationalLimitType.limitType"].str.endswith(".tatl")].groupby("ID_Equipment")
+    patl_limits = limits[limit_type_suffix == "patl"].groupby("ID_Equipment", sort=False).agg(aggregations)
+    tatl_limits = limits[limit_type_suffix == "tatl"].groupby("ID_Equipment", sort=False).agg(aggregations)
 
     # Generate mean voltages for equipment
-    voltages = patl_limits["SvVoltage.v"].mean().round(1).to_dict()
+    voltages = patl_limits["SvVoltage.v"].round(1).to_dict()
 
     patl_current_limits = {}
     tatl_current_limits = {}
-    if "CurrentLimit.value" in limits.columns:
-        patl_current_limits = patl_limits["CurrentLimit.value"].min().to_dict()
-        tatl_current_limits = tatl_limits["CurrentLimit.value"].min().to_dict()
+    if "CurrentLimit.value" in aggregations:
+        patl_current_limits = patl_limits["CurrentLimit.value"].to_dict()
+        tatl_current_limits = tatl_limits["CurrentLimit.value"].to_dict()
 
     patl_power_limits = {}
     tatl_power_limits = {}
-    if "ActivePowerLimit.value" in limits.columns:
-        patl_power_limits = patl_limits["ActivePowerLimit.value"].min().to_dict()
-        tatl_power_limits = tatl_limits["ActivePowerLimit.value"].min().to_dict()
+    if "ActivePowerLimit.value" in aggregations:
+        patl_power_limits = patl_limits["ActivePowerLimit.value"].to_dict()
+        tatl_power_limits = tatl_limits["ActivePowerLimit.value"].to_dict()
 
     # Load crac that is to be updated
     if isinstance(crac_to_update, str):
-       with open(crac_to_update, "r") as file_object:
-           crac = json.load(file_object)
+        with open(crac_to_update, "rb") as file_object:
+            crac = orjson.loads(file_object.read()) if orjson else json.load(file_object)
 
     if isinstance(crac_to_update, dict):
         crac = crac_to_update
 
-    for position, monitored_element in enumerate(crac['flowCnecs']):
-
-        # TODO figure out optimization that same CNEC on preventive and curative instance would be updated
+    # TODO figure out optimization that same CNEC on preventive and curative instance would be updated
 
-        # Handle leading underscore in Crac file
-        if monitored_element['networkElementId'].startswith("_"):
-            _element_id = monitored_element['networkElementId'][1:]
-        else:
-            _element_id = monitored_element['networkElementId']
+    # Vectorize the limit lookups: map all element ids against the limit dicts at once instead of per-CNEC gets
+    flow_cnecs = crac['flowCnecs']
+    cnecs_df = pandas.DataFrame([{'networkElementId': e['networkElementId'], 'instant': e['instant']} for e in flow_cnecs])
 
-        # Set nominal voltage to operational voltages, taken from SV
-        if operational_voltage := voltages.get(_element_id):
-            crac['flowCnecs'][position]['nominalV'] = [operational_voltage]
-            logger.debug(f"Flow CNEC {monitored_element['name']} [{monitored_element['instant']}] nominal voltage updated: {operational_voltage}")
+    # Handle leading underscore in Crac file
+    element_ids = cnecs_df['networkElementId'].str.removeprefix("_")
+    is_preventive = cnecs_df['instant'] != "curative"
 
-        current_limits = patl_current_limits
-        power_limits = patl_power_limits
+    # Select limits by instant of CNEC (PATL for preventive, TATL for curative)
+    operational_voltages = element_ids.map(voltages)
+    power_limit_values = element_ids.map(patl_power_limits).where(is_preventive, element_ids.map(tatl_power_limits))
+    current_limit_values = element_ids.map(patl_current_limits).where(is_preventive, element_ids.map(tatl_current_limits))
 
-        if monitored_element["instant"] == "curative":
+    for monitored_element, voltage, power_limit, current_limit in zip(flow_cnecs,
+                                                                      operational_voltages,
+                                                                      power_limit_values,
+                                                                      current_limit_values):
 
-            current_limits = tatl_current_limits
-            power_limits = tatl_power_limits
-
-        if limit := power_limits.get(_element_id):
-            unit = "megawatt"
-        elif limit := current_limits.get(_element_id):
-            unit = "ampere"
+        # Set nominal voltage to operational voltages, taken from SV
+        # (cast numpy scalars from the mapped series back to plain floats to keep the dict JSON-serializable)
+        if pandas.notna(voltage):
+            monitored_element['nominalV'] = [float(voltage)]
+            logger.debug(f"Flow CNEC {monitored_element['name']} [{monitored_element['instant']}] nominal voltage updated: {voltage}")
+
+        if pandas.notna(power_limit) and power_limit:
+            limit, unit = float(power_limit), "megawatt"
+        elif pandas.notna(current_limit) and current_limit:
+            limit, unit = float(current_limit), "ampere"
         else:
-            logger.warning(f"Limit not found for {monitored_element['name']} with element id: {_element_id}")
+            logger.warning(f"Limit not found for {monitored_element['name']} with element id: {monitored_element['networkElementId'].removeprefix('_')}")
             continue
 
-        crac['flowCnecs'][position]['thresholds'] = [{'max': limit, 'min': limit * -1, 'side': 1, 'unit': unit}]
+        monitored_element['thresholds'] = [{'max': limit, 'min': limit * -1, 'side': 1, 'unit': unit}]
 
     return crac
 
@@ -120,13 +148,16 @@ if __name__ == "__main__":
     CRAC_NAME = "TC1_example_crac.json"
     MODELS = [r"../test-data/tests/test-data/TC1_CGMES.zip"]
 
-    with open(CRAC_NAME, "r") as file_object:
-        crac_to_update = json.load(file_object)
+    with open(CRAC_NAME, "rb") as file_object:
+        crac_to_update = orjson.loads(file_object.read()) if orjson else json.load(file_object)
 
     updated_crac = update_limits(MODELS, crac_to_update)
 
-    with open(CRAC_NAME, "w") as file_object:
-        json.dump(updated_crac, file_object, sort_keys=False, indent=2)
+    with open(CRAC_NAME, "wb") as file_object:
+        if orjson:
+            file_object.write(orjson.dumps(updated_crac, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            file_object.write(json.dumps(updated_crac, sort_keys=False, indent=2).encode())
         logger.info(f"Updated Flow limits and Nominal Voltages in {CRAC_NAME}")
 
 
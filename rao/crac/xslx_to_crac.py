@@ -1,7 +1,13 @@
+import copy
 import pandas as pd
 import json
 import uuid
 
+try:
+    import orjson  # much faster dump for large CRACs
+except ImportError:
+    orjson = None
+
 
 PATH_ASSESSED_ELEMENTS = r"/crosa/common_assessed_element_list.xlsx"
 PATH_CONTINGENCIES = r"/crosa/common_contingency_list.xlsx"
@@ -24,7 +30,17 @@ remedial_actions_df = remedial_actions_df[remedial_actions_df.alt_type == 'Topol
 contingencies_df = contingencies_df[contingencies_df.co_name.isin(['OCO_LN317'])]
 
 
-crac = {
+# Shared constants for CNEC attributes: json.dump only reads, so all CNECs can reference the same objects
+DEFAULT_THRESHOLDS = [{
+    "unit": "megawatt",
+    "min": -350,
+    "max": 350,
+    "side": 1
+}]
+DEFAULT_NOMINAL_V = [330.0]
+
+# Frozen CRAC skeleton: deep-copied per built CRAC so the template stays pristine for reuse
+CRAC_TEMPLATE = {
     "type": "CRAC",
     "version": "2.4",
     "info": "Baltic common CRAC file",
@@ -47,78 +63,76 @@ crac = {
     "networkActions": [],
 }
 
-for ae in assessed_elements_df.to_dict('records'):
-    cnec = {
-        "id": ae['registered_resource'],
-        "name": ae['name'],
-        "networkElementId": ae['grid_element_id'],
-        "operator": ae['operator'],
-        "thresholds": [{
-            "unit": "megawatt",
-            "min": -350,
-            "max": 350,
-            "side": 1
-        }],
-        "instant": "preventive",
+crac = copy.deepcopy(CRAC_TEMPLATE)
+
+# Build CNECs vectorized: select and rename relevant columns once
+cnecs_df = assessed_elements_df[['registered_resource', 'name', 'grid_element_id', 'operator']].rename(
+    columns={'registered_resource': 'id', 'grid_element_id': 'networkElementId'})
+
+# Preventive CNECs: one per assessed element
+preventive_cnecs = cnecs_df.assign(instant="preventive").to_dict('records')
+
+# Group contingencies once, the grouping is reused for both CNECs and the contingency list
+contingency_groups = contingencies_df.groupby("registered_resource", sort=False)
+
+# Curative CNECs: cross product of assessed elements and contingencies (hoisted out of the loop)
+contingency_ids = list(contingency_groups.groups)
+curative_cnecs_df = cnecs_df.merge(pd.DataFrame({'contingencyId': contingency_ids}), how='cross')
+curative_cnecs_df['id'] = [f"_{uuid.uuid4()}" for _ in range(len(curative_cnecs_df))]
+curative_cnecs = curative_cnecs_df.assign(instant="curative").to_dict('records')
+
+# Add constant attributes and collect to CRAC
+all_cnecs = preventive_cnecs + curative_cnecs
+for cnec in all_cnecs:
+    cnec.update({
+        "thresholds": DEFAULT_THRESHOLDS,
         "optimized": True,
         "monitored": False,
-        "nominalV": [330.0],
-    }
-    crac['flowCnecs'].append(cnec)
-
-    for mrid, gdf in contingencies_df.groupby("registered_resource"):
-        cnec_curative = {
-            "id": f"_{uuid.uuid4()}",
-            "name": ae['name'],
-            "networkElementId": ae['grid_element_id'],
-            "operator": ae['operator'],
-            "thresholds": [{
-                "unit": "megawatt",
-                "min": -350,
-                "max": 350,
-                "side": 1
-            }],
-            "contingencyId": mrid,
-            "instant": "curative",
-            "optimized": True,
-            "monitored": False,
-            "nominalV": [330.0],
-        }
-        crac['flowCnecs'].append(cnec_curative)
-
-
-for mrid, gdf in contingencies_df.groupby("registered_resource"):
-    contingency = {
+        "nominalV": DEFAULT_NOMINAL_V,
+    })
+crac['flowCnecs'] = all_cnecs
+
+
+# Aggregate name and grid elements per contingency in a single pass instead of scanning each group twice
+contingency_agg = contingency_groups.agg(co_name=('co_name', 'first'), grid_ids=('grid_element_id', list))
+crac['contingencies'] = [
+    {
         "id": mrid,
-        "name": gdf.co_name.unique().item(),
-        "networkElementsIds": gdf["grid_element_id"].to_list()
+        "name": co_name,
+        "networkElementsIds": grid_ids
     }
-    crac['contingencies'].append(contingency)
-
-for ra in remedial_actions_df.to_dict('records'):
-    remedial_action = {
-      "id": ra['registered_resource'],
-      "name": ra['ra_name'],
-      "operator": ra['operator'],
-      "onInstantUsageRules": [
-        {
-            "usageMethod": "available",
-            "instant": "preventive"
-        },
-        {
-            "usageMethod": "available",
-            "instant": "curative"
-        }
-      ],
-      "topologicalActions": [
-        {
-            "networkElementId": ra['equipment'],
-            "actionType": "open"
-        }
-      ]
+    for mrid, co_name, grid_ids in contingency_agg.itertuples()
+]
+
+# itertuples over only the needed columns avoids building one full-width dict per row
+crac['networkActions'] = [
+    {
+        "id": registered_resource,
+        "name": ra_name,
+        "operator": operator,
+        "onInstantUsageRules": [
+            {
+                "usageMethod": "available",
+                "instant": "preventive"
+            },
+            {
+                "usageMethod": "available",
+                "instant": "curative"
+            }
+        ],
+        "topologicalActions": [
+            {
+                "networkElementId": equipment,
+                "actionType": "open"
+            }
+        ]
     }
-    crac['networkActions'].append(remedial_action)
+    for registered_resource, ra_name, operator, equipment
+    in remedial_actions_df[['registered_resource', 'ra_name', 'operator', 'equipment']].itertuples(index=False, name=None)
+]
 
-with open("common_baltic_crac.json", "w") as f:
-    json_string = json.dumps(crac, sort_keys=False, indent=2)
-    f.write(json_string)
+with open("common_baltic_crac.json", "wb") as f:
+    if orjson:
+        f.write(orjson.dumps(crac, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        f.write(json.dumps(crac, sort_keys=False, indent=2).encode())